@@ -1,7 +1,20 @@
-import os, json, re, math, random, csv, threading
-from typing import Any, Dict, List, Optional
+import os, json, re, random, csv, logging, queue, threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, NamedTuple, Optional
 from urllib.parse import parse_qs
-from locust import HttpUser, between, constant, events
+from locust import between, constant, events
+from locust.contrib.fasthttp import FastHttpSession, FastHttpUser
+
+# Queue-backed logging: producers only enqueue records, a single listener
+# thread writes them out, so concurrent user startup doesn't serialize on the
+# stdout lock the way bare print() does.
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+log = logging.getLogger("automock.locustfile")
+log.addHandler(QueueHandler(_log_queue))
+log.setLevel(logging.INFO)
+log.propagate = False
 
 # -------------------------------------------------------------------
 # Config / Spec Loading
@@ -10,26 +23,62 @@ from locust import HttpUser, between, constant, events
 JSON_PATH = os.getenv("AM_LOCUST_JSON", "locust_endpoints.json")
 HOST_ENV  = os.getenv("AM_HOST")  # Optional. If not set, host can be set in Locust UI.
 
-_env_re = re.compile(r"\$\{env\.([A-Za-z_][A-Za-z0-9_]*)\}")
-_data_re = re.compile(r"\$\{data\.([A-Za-z_][A-Za-z0-9_]*)\}")
-_user_re = re.compile(r"\$\{user\.(id|index)\}")
+# Faster JSON parsing when orjson is installed (large specs / user-data files);
+# falls back to stdlib. Spec files are opened in binary mode for the fast path.
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+
+    def _json_load(f):
+        return orjson.loads(f.read())
+except Exception:
+    _json_loads = json.loads
+    _json_load = json.load
+
+# re.ASCII: placeholder names are ASCII identifiers, so skip the Unicode
+# property tables when these run over the whole spec at import time
+_env_re = re.compile(r"\$\{env\.([A-Za-z_][A-Za-z0-9_]*)\}", re.ASCII)
+_data_re = re.compile(r"\$\{data\.([A-Za-z_][A-Za-z0-9_]*)\}", re.ASCII)
+_user_re = re.compile(r"\$\{user\.(id|index)\}", re.ASCII)
+_env_sub = _env_re.sub
+
+def _env_repl(m):
+    return os.getenv(m.group(1), "")
 
 def _expand_env(v: Any):
+    """Expand ${env.X} placeholders across a freshly parsed spec.
+
+    Containers are walked with an explicit worklist and mutated in place —
+    we own the tree right after json parsing — so large specs don't pay a
+    Python stack frame per node."""
     if isinstance(v, str):
-        return _env_re.sub(lambda m: os.getenv(m.group(1), ""), v)
-    if isinstance(v, dict):
-        return {k: _expand_env(x) for k, x in v.items()}
-    if isinstance(v, list):
-        return [_expand_env(x) for x in v]
+        return _env_sub(_env_repl, v)
+    if not isinstance(v, (dict, list)):
+        return v
+    stack = [v]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for k, x in items:
+            if isinstance(x, str):
+                node[k] = _env_sub(_env_repl, x)
+            elif isinstance(x, (dict, list)):
+                stack.append(x)
     return v
 
-with open(JSON_PATH, "r", encoding="utf-8") as f:
-    SPEC = _expand_env(json.load(f))
+with open(JSON_PATH, "rb") as f:
+    SPEC = _expand_env(_json_load(f))
 
 AUTH   = SPEC.get("auth") or {"mode": "none"}
 CFG    = SPEC.get("config") or {}
 EPS    = SPEC.get("endpoints") or []
 
+# Auth invariants, resolved once instead of per request/user
+AUTH_MODE: str = (AUTH.get("mode") or "none").lower()  # none | shared | per_user
+AUTH_HEADER_NAME: str = AUTH.get("header_name", "Authorization")
+AUTH_HEADER_PREFIX: str = AUTH.get("header_prefix", "Bearer ")
+
 # Data assignment config
 DATA_ASSIGNMENT: str = (CFG.get("data_assignment") or "round_robin").lower()  # shared | round_robin | random
 try:
@@ -56,9 +105,9 @@ def _load_user_data(base_dir: Optional[str] = None):
             if os.path.exists(candidate):
                 path = candidate
                 break
-    if not os.path.exists(path):
+    if not path or not os.path.exists(path):
         if path:
-            print(f"[data] User data file not found: {path}")
+            log.warning("[data] User data file not found: %s", path)
         return
     try:
         if path.lower().endswith(".csv"):
@@ -69,7 +118,7 @@ def _load_user_data(base_dir: Optional[str] = None):
             try:
                 import yaml  # type: ignore
             except Exception as e:
-                print("[data] PyYAML not installed; add 'pyyaml' to requirements.txt or use CSV/JSON")
+                log.warning("[data] PyYAML not installed; add 'pyyaml' to requirements.txt or use CSV/JSON")
                 USER_DATA = []
             else:
                 with open(path, "r", encoding="utf-8") as yf:
@@ -77,7 +126,7 @@ def _load_user_data(base_dir: Optional[str] = None):
                     if isinstance(data, list):
                         USER_DATA = data
                     else:
-                        print("[data] YAML must be a list of objects")
+                        log.warning("[data] YAML must be a list of objects")
                         USER_DATA = []
         else:
             # JSON array or NDJSON
@@ -86,17 +135,40 @@ def _load_user_data(base_dir: Optional[str] = None):
                 if not txt:
                     return
                 if txt[0] == "[":
-                    USER_DATA = json.loads(txt)
+                    USER_DATA = _json_loads(txt)
                 else:
-                    USER_DATA = [json.loads(line) for line in txt.splitlines() if line.strip()]
+                    USER_DATA = [_json_loads(line) for line in txt.splitlines() if line.strip()]
         if USER_DATA:
-            print(f"[data] Loaded {len(USER_DATA)} user data rows from {path}")
+            log.info("[data] Loaded %d user data rows from %s", len(USER_DATA), path)
     except Exception as e:
-        print(f"[data] Failed to load AM_USER_DATA: {e}")
+        log.warning("[data] Failed to load AM_USER_DATA: %s", e)
 
 # Initialize user data with auto-discovery next to the spec JSON
 _load_user_data(os.path.dirname(JSON_PATH) or ".")
 
+# Columnar view of USER_DATA: field names resolved to tuple indexes once, so
+# compiled renderers do tuple indexing instead of per-call dict hashing.
+USER_DATA_FIELDS: tuple = ()
+USER_DATA_ROWS: List[tuple] = []
+_FIELD_INDEX: Dict[str, int] = {}
+
+def _columnarize_user_data():
+    global USER_DATA_FIELDS, USER_DATA_ROWS, _FIELD_INDEX
+    if not USER_DATA:
+        return
+    fields: List[str] = []
+    seen = set()
+    for row in USER_DATA:
+        for k in row:
+            if k not in seen:
+                seen.add(k)
+                fields.append(k)
+    USER_DATA_FIELDS = tuple(fields)
+    _FIELD_INDEX = {k: i for i, k in enumerate(fields)}
+    USER_DATA_ROWS = [tuple(row.get(k, "") for k in fields) for row in USER_DATA]
+
+_columnarize_user_data()
+
 def _expand_runtime(v: Any, ctx: Dict[str, Any]):
     if isinstance(v, str):
         s = v
@@ -109,6 +181,16 @@ def _expand_runtime(v: Any, ctx: Dict[str, Any]):
         return [_expand_runtime(x, ctx) for x in v]
     return v
 
+# Per-thread RNG instances: the module-level random functions share one
+# Random object, which serializes callers under concurrency.
+_rng_local = threading.local()
+
+def _local_rng() -> random.Random:
+    rng = getattr(_rng_local, "rng", None)
+    if rng is None:
+        rng = _rng_local.rng = random.Random()
+    return rng
+
 def _claim_user_index() -> int:
     global _USER_COUNTER
     with _DATA_LOCK:
@@ -116,15 +198,15 @@ def _claim_user_index() -> int:
         _USER_COUNTER += 1
         return idx
 
-def _assign_user_data(user_index: int):
+def _assign_user_data_index(user_index: int, rng: Optional[random.Random] = None) -> Optional[int]:
     if not USER_DATA:
         return None
     if DATA_ASSIGNMENT == "shared":
-        return USER_DATA[DATA_SHARED_INDEX % len(USER_DATA)]
+        return DATA_SHARED_INDEX % len(USER_DATA)
     if DATA_ASSIGNMENT == "random":
-        return random.choice(USER_DATA)
+        return (rng or _local_rng()).randrange(len(USER_DATA))
     # round_robin (default)
-    return USER_DATA[user_index % len(USER_DATA)]
+    return user_index % len(USER_DATA)
 
 # -------------------------------------------------------------------
 # Config defaults & helpers
@@ -166,6 +248,7 @@ CONST_WAIT = _cfg_float("constant_wait_seconds", 1.0)
 
 REQUEST_TIMEOUT = _cfg_float("request_timeout_seconds", 30.0)
 VERIFY_TLS = _cfg_bool("verify_tls", True)
+PREWARM_CONNECTIONS = _cfg_bool("prewarm_connections", True)
 
 INCLUDE_TAGS = set(_cfg_list("include_tags"))
 EXCLUDE_TAGS = set(_cfg_list("exclude_tags"))
@@ -177,6 +260,11 @@ EXCLUDE_TAGS = set(_cfg_list("exclude_tags"))
 _SHARED_TOKEN: Optional[str] = None
 _SHARED_TOKEN_LOCK = threading.Lock()
 
+def _format_auth_header(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    return f"{AUTH_HEADER_PREFIX}{token}" if AUTH_HEADER_PREFIX else token
+
 def _json_get(d: Any, path: str, default=None):
     cur = d
     if not path:
@@ -188,8 +276,7 @@ def _json_get(d: Any, path: str, default=None):
     return cur
 
 def _do_auth(client, ctx: Optional[Dict[str, Any]] = None):
-    mode = (AUTH.get("mode") or "none").lower()
-    if mode == "none":
+    if AUTH_MODE == "none":
         return None
 
     method  = (AUTH.get("method") or "POST").upper()
@@ -201,15 +288,16 @@ def _do_auth(client, ctx: Optional[Dict[str, Any]] = None):
         body    = _expand_runtime(body, ctx)
         path    = _expand_runtime(path, ctx)
 
-    kwargs = {"headers": headers, "timeout": REQUEST_TIMEOUT, "verify": VERIFY_TLS}
+    # Timeouts and TLS verification are configured at the session level (FastHttpUser
+    # class attributes / FastHttpSession insecure flag), not per request.
+    kwargs = {"headers": headers}
     if body is not None:
         kwargs["json" if isinstance(body, (dict, list)) else "data"] = body
 
-    url_or_path = path if (path.startswith("http://") or path.startswith("https://")) else path
-
-    r = client.request(method, url_or_path, name="AUTH "+path, **kwargs)
+    # Absolute URLs and host-relative paths are both handed to the client as-is
+    r = client.request(method, path, name="AUTH "+path, **kwargs)
     if r.status_code >= 400:
-        print(f"[auth] failed: HTTP {r.status_code} - {r.text[:200]}")
+        log.warning("[auth] failed: HTTP %d - %s", r.status_code, r.text[:200])
         return None
 
     # Try JSON first
@@ -229,55 +317,56 @@ def _do_auth(client, ctx: Optional[Dict[str, Any]] = None):
             token = None
 
     if not token:
-        print(f"[auth] token not found at path '{token_path}'. Raw body (truncated): {r.text[:200]}")
+        log.warning("[auth] token not found at path '%s'. Raw body (truncated): %s", token_path, r.text[:200])
         return None
     return token
 
 @events.test_start.add_listener
 def _on_test_start(environment, **_):
     global _SHARED_TOKEN
-    if (AUTH.get("mode") or "none").lower() == "shared":
+    if AUTH_MODE == "shared":
         # Prefer newer API; fallback for older Locust versions
         base_host = HOST_ENV or getattr(environment, "host", None)
         if not base_host:
             # Host not provided yet (e.g., user will set it in UI). Defer shared auth to user on_start.
-            print("[auth] Host not set at test start; will initialize shared token lazily when users start.")
+            log.info("[auth] Host not set at test start; will initialize shared token lazily when users start.")
             return
         client = None
-        # Attempt context-based client only; if unavailable, defer to lazy init without emitting errors.
+        # One-shot fasthttp session for the shared auth call; if construction fails
+        # (e.g. older Locust), defer to lazy init in on_start without emitting errors.
         try:
-            ctx = environment.create_local_http_context(base_host)
-            client = ctx.client
+            client = FastHttpSession(base_host, environment.events.request, None,
+                                     insecure=not VERIFY_TLS)
         except Exception:
             # Silent defer; on_start will acquire token.
             return
 
         if client is not None:
-            client.verify = VERIFY_TLS
             _SHARED_TOKEN = _do_auth(client)
+            AutoMockUser._shared_auth_ref[0] = _format_auth_header(_SHARED_TOKEN)
         if _SHARED_TOKEN:
-            print("🔐 Auth OK (shared token)")
+            log.info("🔐 Auth OK (shared token)")
 
 # -------------------------------------------------------------------
 # Wait-time strategies
 # -------------------------------------------------------------------
 
-def _random_exp_wait():
-    # Exponential-like wait with mean roughly between MIN and MAX; cap at MAX
-    # Lambda chosen so that ~63% values are under (MAX - MIN)
-    span = max(MAX_WAIT - MIN_WAIT, 0.001)
-    val = random.expovariate(1.0 / (span / 1.5))  # tune as desired
-    return min(MIN_WAIT + val, MAX_WAIT)
+# Exponential-like wait with mean roughly between MIN and MAX; cap at MAX.
+# Lambda chosen so that ~63% values are under (MAX - MIN); precomputed so each
+# wait call is a single expovariate draw.
+_EXP_LAMBDA = 1.0 / (max(MAX_WAIT - MIN_WAIT, 0.001) / 1.5)
+
+def _random_exp_wait(user):
+    # Signature matches locust's wait_time callables (bound as a method)
+    rng = getattr(user, "_rng", None) or _local_rng()
+    return min(MIN_WAIT + rng.expovariate(_EXP_LAMBDA), MAX_WAIT)
 
 def _select_wait_strategy():
     if WAIT_STRATEGY == "constant":
         return constant(CONST_WAIT)
     if WAIT_STRATEGY == "random_exp":
-        # emulate via custom function wrapper
-        class _Exp:
-            def __call__(self):
-                return _random_exp_wait()
-        return _Exp()
+        # Locust accepts any plain callable
+        return _random_exp_wait
     # default
     return between(MIN_WAIT, MAX_WAIT)
 
@@ -285,34 +374,163 @@ def _select_wait_strategy():
 # Task model
 # -------------------------------------------------------------------
 
-def _should_include(endpoint: Dict[str, Any]) -> bool:
-    tags = set(endpoint.get("tags") or [])
-    if INCLUDE_TAGS and not (tags & INCLUDE_TAGS):
+def _should_include(tags: frozenset) -> bool:
+    if not INCLUDE_TAGS and not EXCLUDE_TAGS:
+        return True
+    # isdisjoint short-circuits without building an intersection set
+    if INCLUDE_TAGS and INCLUDE_TAGS.isdisjoint(tags):
         return False
-    if EXCLUDE_TAGS and (tags & EXCLUDE_TAGS):
+    if EXCLUDE_TAGS and not EXCLUDE_TAGS.isdisjoint(tags):
         return False
     return True
 
-class AutoMockUser(HttpUser):
+class EndpointPlan(NamedTuple):
+    """Per-endpoint request invariants, computed once at module load so the
+    task hot path doesn't redo upper-casing, dict merges and prefix checks."""
+    method: str
+    path: str
+    name: str
+    headers: Dict[str, str]
+    params: Dict[str, str]
+    body: Any
+    body_kwarg: str           # "json" or "data"
+    is_absolute: bool
+    has_templates: bool
+    tags: frozenset
+    # Precompiled ctx -> value renderers; None when the field has no placeholders
+    render_path: Optional[Any]
+    render_headers: Optional[Any]
+    render_params: Optional[Any]
+    render_body: Optional[Any]
+
+# Combined ${data.X} / ${user.id|index} placeholder, matched once at build time
+_runtime_tmpl_re = re.compile(r"\$\{(data\.[A-Za-z_][A-Za-z0-9_]*|user\.(?:id|index))\}", re.ASCII)
+
+def _field_getter(section: str, field: str):
+    """Resolve a placeholder to a getter over the render ctx, a
+    (data row tuple | None, user index) pair. ${data.*} fields become tuple
+    indexes resolved here, at build time."""
+    if section == "user":
+        return lambda ctx: str(ctx[1])
+    idx = _FIELD_INDEX.get(field)
+    if idx is None:
+        return lambda ctx: ""
+    return lambda ctx, _i=idx: str(ctx[0][_i]) if ctx[0] else ""
+
+def _compile_template(s: str):
+    """Compile a string into a ctx -> str renderer, or None if it has no
+    runtime placeholders. Renderers join literal chunks and looked-up fields,
+    so no regex or dict hashing runs per render."""
+    parts: List[Any] = []
+    pos = 0
+    for m in _runtime_tmpl_re.finditer(s):
+        if m.start() > pos:
+            parts.append(s[pos:m.start()])
+        section, field = m.group(1).split(".", 1)
+        parts.append(_field_getter(section, field))
+        pos = m.end()
+    if not parts:
+        return None
+    if pos < len(s):
+        parts.append(s[pos:])
+    if len(parts) == 1 and not isinstance(parts[0], str):
+        return parts[0]
+    chunks = tuple(parts)
+    def render(ctx):
+        return "".join(p if isinstance(p, str) else p(ctx) for p in chunks)
+    return render
+
+def _compile_value(v: Any):
+    """Compile an arbitrary spec value (str/dict/list/scalar) into a
+    ctx -> value renderer, or None when it's placeholder-free and can be
+    reused as-is. Template-free subtrees are shared, not copied."""
+    if isinstance(v, str):
+        return _compile_template(v)
+    if isinstance(v, dict):
+        subs = {k: _compile_value(x) for k, x in v.items()}
+        if not any(subs.values()):
+            return None
+        def render_dict(ctx, _v=v, _subs=subs):
+            return {k: (_subs[k](ctx) if _subs[k] else x) for k, x in _v.items()}
+        return render_dict
+    if isinstance(v, list):
+        subs = [_compile_value(x) for x in v]
+        if not any(subs):
+            return None
+        def render_list(ctx, _v=v, _subs=subs):
+            return [(s(ctx) if s else x) for s, x in zip(_subs, _v)]
+        return render_list
+    return None
+
+def _build_plan(ep: Dict[str, Any]) -> EndpointPlan:
+    method = (ep.get("method") or "GET").upper()
+    path   = ep.get("path") or "/"
+    name   = ep.get("name") or f"{method} {path}"
+    # Default-merged once here; these dicts are shared across all users and
+    # every task call, so nothing downstream may mutate them in place.
+    headers = {**DEFAULT_HEADERS, **(ep.get("headers") or {})}
+    params  = {**DEFAULT_PARAMS,  **(ep.get("params")  or {})}
+    body    = ep.get("body")
+    renderers = tuple(_compile_value(v) for v in (path, headers, params, body))
+    return EndpointPlan(
+        method=method,
+        path=path,
+        name=name,
+        headers=headers,
+        params=params,
+        body=body,
+        body_kwarg="json" if isinstance(body, (dict, list)) else "data",
+        is_absolute=path.startswith(("http://", "https://")),
+        has_templates=any(renderers),
+        tags=frozenset(ep.get("tags") or ()),
+        render_path=renderers[0],
+        render_headers=renderers[1],
+        render_params=renderers[2],
+        render_body=renderers[3],
+    )
+
+class AutoMockUser(FastHttpUser):
     wait_time = _select_wait_strategy()
     if HOST_ENV:
         host = HOST_ENV  # otherwise set in UI
 
-    def on_start(self):
-        # Set per-session TLS verification
-        self.client.verify = VERIFY_TLS
+    # TLS verification and timeouts are session-wide for fasthttp
+    insecure = not VERIFY_TLS
+    network_timeout = REQUEST_TIMEOUT
+    connection_timeout = REQUEST_TIMEOUT
+
+    # Shared-auth header value, published by writers via item assignment
+    # (atomic in CPython) and read lock-free on the hot path.
+    _shared_auth_ref: List[Optional[str]] = [None]
 
+    def on_start(self):
         # Per-user auth
         self._token = None
-        # Assign deterministic user index and optional data row
+        self._auth_header = None            # preformatted header value for this user
+        self._auth_headers_cache = {}       # id(plan) -> (header value, merged headers)
+        self._rendered_cache = {}           # id(plan) -> (path, headers, params, body)
+        # Assign deterministic user index and optional data row (dict form for
+        # the auth flow, tuple form for the compiled renderers)
         self._user_index = _claim_user_index()
-        self._data = _assign_user_data(self._user_index)
-        if (AUTH.get("mode") or "none").lower() == "per_user":
+        self._rng = random.Random()
+        row_idx = _assign_user_data_index(self._user_index, self._rng)
+        self._data = USER_DATA[row_idx] if row_idx is not None else None
+        self._data_row = USER_DATA_ROWS[row_idx] if row_idx is not None else None
+        if AUTH_MODE == "per_user":
             ctx = {"data": self._data or {}, "user": {"id": self._user_index, "index": self._user_index}}
             self._token = _do_auth(self.client, ctx)
+            self._auth_header = _format_auth_header(self._token)
+
+        # Pre-warm the connection so the TCP+TLS handshake completes before the
+        # first timed request. per_user auth already primed it via _do_auth.
+        if PREWARM_CONNECTIONS and AUTH_MODE != "per_user" and getattr(self, "host", None):
+            try:
+                self.client.get("/", name="__warmup__")
+            except Exception:
+                pass
 
         # Lazy init for shared auth if host wasn't available at test_start
-        if (AUTH.get("mode") or "none").lower() == "shared" and not _SHARED_TOKEN:
+        if AUTH_MODE == "shared" and not _SHARED_TOKEN:
             # Ensure host is set on this user if provided via env
             if HOST_ENV and not getattr(self, "host", None):
                 self.host = HOST_ENV
@@ -323,78 +541,109 @@ class AutoMockUser(HttpUser):
                         if tok:
                             # Assign after successful retrieval
                             globals()["_SHARED_TOKEN"] = tok
-                            print("🔐 Auth OK (shared token, lazy)")
+                            AutoMockUser._shared_auth_ref[0] = _format_auth_header(tok)
+                            log.info("🔐 Auth OK (shared token, lazy)")
 
     def _apply_token(self, headers: Dict[str, str]) -> Dict[str, str]:
-        mode = (AUTH.get("mode") or "none").lower()
-        if mode == "none":
-            return headers or {}
-
-        token = _SHARED_TOKEN if mode == "shared" else self._token
-        if not token:
-            return headers or {}
-
-        name   = AUTH.get("header_name", "Authorization")
-        prefix = AUTH.get("header_prefix", "Bearer ")
+        # Rendered-header path. The incoming dict comes from this user's
+        # rendered-plan cache, so it is long-lived and id-stable; memoize the
+        # token merge against it like the invariant path does.
+        value = self._shared_auth_ref[0] if AUTH_MODE == "shared" else self._auth_header
+        if not value:
+            # No copy: the cached dict is passed straight through
+            return headers
+
+        cached = self._auth_headers_cache.get(id(headers))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        merged = dict(headers)
+        merged[AUTH_HEADER_NAME] = value
+        self._auth_headers_cache[id(headers)] = (value, merged)
+        return merged
 
-        merged = dict(headers or {})
-        merged[name] = f"{prefix}{token}" if prefix else token
+    def _auth_headers_for(self, plan: "EndpointPlan") -> Dict[str, str]:
+        # For endpoints with invariant headers, merge the auth header once per
+        # user and reuse the dict until the token value changes.
+        value = self._shared_auth_ref[0] if AUTH_MODE == "shared" else self._auth_header
+        if not value:
+            return plan.headers
+        cached = self._auth_headers_cache.get(id(plan))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        merged = dict(plan.headers)
+        merged[AUTH_HEADER_NAME] = value
+        self._auth_headers_cache[id(plan)] = (value, merged)
         return merged
 
-    def _do(self, ep: Dict[str, Any]):
-        method = (ep["method"] or "GET").upper()
-        path   = ep["path"]
-        name   = ep.get("name") or f"{method} {path}"
+    if AUTH_MODE == "none":
+        # No auth configured: keep the hot path out of the token logic entirely
+        def _apply_token(self, headers: Dict[str, str]) -> Dict[str, str]:  # type: ignore[no-redef]
+            return headers
 
-        # Merge defaults with endpoint-specific
-        headers = {**DEFAULT_HEADERS, **(ep.get("headers") or {})}
-        params  = {**DEFAULT_PARAMS,  **(ep.get("params")  or {})}
-        body    = ep.get("body")
+        def _auth_headers_for(self, plan: "EndpointPlan") -> Dict[str, str]:  # type: ignore[no-redef]
+            return plan.headers
 
-        # Runtime parameterization: ${data.field} and ${user.id|index}
-        ctx = {"data": self._data or {}, "user": {"id": self._user_index, "index": self._user_index}}
-        path   = _expand_runtime(path, ctx)
-        headers = _expand_runtime(headers, ctx)
-        params  = _expand_runtime(params, ctx)
-        body    = _expand_runtime(body, ctx)
+    def _do(self, plan: EndpointPlan):
+        path    = plan.path
+        headers = plan.headers
+        params  = plan.params
+        body    = plan.body
 
-        # Apply Authorization from auth flow (overrides same header if present)
-        headers = self._apply_token(headers)
+        # Runtime parameterization: ${data.field} and ${user.id|index}
+        # Both inputs are fixed per user, so rendered output is cached after the
+        # first call and reused for the user's whole lifetime.
+        if plan.has_templates:
+            rendered = self._rendered_cache.get(id(plan))
+            if rendered is None:
+                ctx = (self._data_row, self._user_index)
+                rendered = (
+                    plan.render_path(ctx) if plan.render_path else path,
+                    plan.render_headers(ctx) if plan.render_headers else headers,
+                    plan.render_params(ctx) if plan.render_params else params,
+                    plan.render_body(ctx) if plan.render_body else body,
+                )
+                self._rendered_cache[id(plan)] = rendered
+            path, headers, params, body = rendered
+
+        # Apply Authorization from auth flow (overrides same header if present).
+        # Invariant-header endpoints reuse a per-user merged dict; rendered
+        # headers fall back to the copying path.
+        if plan.render_headers is None:
+            headers = self._auth_headers_for(plan)
+        else:
+            headers = self._apply_token(headers)
 
         kwargs = {
             "headers": headers,
             "params": params,
-            "timeout": REQUEST_TIMEOUT,
         }
         if body is not None:
-            kwargs["json" if isinstance(body, (dict, list)) else "data"] = body
-
-        # Absolute URL supported; otherwise path is relative to host/UI
-        url_or_path = path if (path.startswith("http://") or path.startswith("https://")) else path
+            kwargs[plan.body_kwarg] = body
 
-        # Perform request
-        with self.client.request(method, url_or_path, name=name, **kwargs, catch_response=True) as resp:
-            if 200 <= resp.status_code < 400:
+        # Perform request (absolute URLs supported; otherwise path is relative to host/UI)
+        with self.client.request(plan.method, path, name=plan.name, **kwargs, catch_response=True) as resp:
+            sc = resp.status_code
+            if 200 <= sc < 400:
                 resp.success()
             else:
-                resp.failure(f"HTTP {resp.status_code}")
+                resp.failure("HTTP %d" % sc)
 
 # Build weighted tasks dynamically, honoring include/exclude tags
 _tasks: Dict[Any, int] = {}
 for ep in EPS:
-    if not _should_include(ep):
+    _plan = _build_plan(ep)
+    if not _should_include(_plan.tags):
         continue
     w = int(ep.get("weight", 1))
 
-    def make_task(endpoint: Dict[str, Any]):
+    def make_task(plan: EndpointPlan):
         def _t(self: AutoMockUser):
-            self._do(endpoint)
+            self._do(plan)
         # Stable python method name
-        nm = endpoint.get("name") or f"{endpoint.get('method','GET')} {endpoint.get('path','/')}"
-        _t.__name__ = "task_" + re.sub(r"[^A-Za-z0-9_]+", "_", nm)[:80]
+        _t.__name__ = "task_" + re.sub(r"[^A-Za-z0-9_]+", "_", plan.name)[:80]
         return _t
 
-    fn = make_task(ep)
+    fn = make_task(_plan)
     _tasks[fn] = w if w > 0 else 1
 
 AutoMockUser.tasks = _tasks
@@ -9,6 +9,8 @@ import (
 	"io"
 	"os"
 	"sort"
+	"sync"
+	"sync/atomic"
 
 	"github.com/aws/aws-sdk-go-v2/aws"
 	"github.com/aws/aws-sdk-go-v2/service/s3"
@@ -56,10 +58,17 @@ func (p *Provider) deleteBundleObjects(ctx context.Context, baseID, bundleID str
 		if len(resp.Contents) == 0 {
 			break
 		}
+		// Batch the whole page (<=1000 keys, the DeleteObjects limit) into one
+		// call instead of a DeleteObject round-trip per key.
+		objs := make([]types.ObjectIdentifier, 0, len(resp.Contents))
 		for _, obj := range resp.Contents {
-			if _, derr := p.S3Client.DeleteObject(ctx, &s3.DeleteObjectInput{Bucket: aws.String(p.BucketName), Key: obj.Key}); derr == nil {
-				deleted++
-			}
+			objs = append(objs, types.ObjectIdentifier{Key: obj.Key})
+		}
+		if _, derr := p.S3Client.DeleteObjects(ctx, &s3.DeleteObjectsInput{
+			Bucket: aws.String(p.BucketName),
+			Delete: &types.Delete{Objects: objs, Quiet: aws.Bool(true)},
+		}); derr == nil {
+			deleted += len(objs)
 		}
 		if (resp.IsTruncated != nil && *resp.IsTruncated) && resp.NextContinuationToken != nil {
 			token = resp.NextContinuationToken
@@ -139,11 +148,19 @@ func (p *Provider) writePointerForVersion(ctx context.Context, ver *models.LoadT
 }
 
 // deleteAllVersionsWithPrefix deletes all versions and delete markers under a prefix.
+// Pages stream from the paginator while batch deletes run concurrently, so a large
+// versioned prefix is bounded by the slowest in-flight DeleteObjects rather than
+// the sum of one round-trip per page.
 func (p *Provider) deleteAllVersionsWithPrefix(ctx context.Context, prefix string) int {
-	deleted := 0
+	var deleted int64
+	var wg sync.WaitGroup
+	sem := make(chan struct{}, 8)
 	pager := s3.NewListObjectVersionsPaginator(p.S3Client, &s3.ListObjectVersionsInput{Bucket: aws.String(p.BucketName), Prefix: aws.String(prefix)})
 	for pager.HasMorePages() {
 		page, _ := pager.NextPage(ctx)
+		if page == nil {
+			break
+		}
 		var objs []types.ObjectIdentifier
 		for _, v := range page.Versions {
 			objs = append(objs, types.ObjectIdentifier{Key: v.Key, VersionId: v.VersionId})
@@ -152,12 +169,19 @@ func (p *Provider) deleteAllVersionsWithPrefix(ctx context.Context, prefix strin
 			objs = append(objs, types.ObjectIdentifier{Key: m.Key, VersionId: m.VersionId})
 		}
 		if len(objs) > 0 {
-			if _, err := p.S3Client.DeleteObjects(ctx, &s3.DeleteObjectsInput{Bucket: aws.String(p.BucketName), Delete: &types.Delete{Objects: objs, Quiet: aws.Bool(true)}}); err == nil {
-				deleted += len(objs)
-			}
+			wg.Add(1)
+			sem <- struct{}{}
+			go func(objs []types.ObjectIdentifier) {
+				defer wg.Done()
+				defer func() { <-sem }()
+				if _, err := p.S3Client.DeleteObjects(ctx, &s3.DeleteObjectsInput{Bucket: aws.String(p.BucketName), Delete: &types.Delete{Objects: objs, Quiet: aws.Bool(true)}}); err == nil {
+					atomic.AddInt64(&deleted, int64(len(objs)))
+				}
+			}(objs)
 		}
 	}
-	return deleted
+	wg.Wait()
+	return int(deleted)
 }
 
 // deleteAllVersionsForKey deletes all versions and markers for a single key.
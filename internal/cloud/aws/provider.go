@@ -7,6 +7,7 @@ import (
 	"fmt"
 
 	"github.com/aws/aws-sdk-go-v2/aws"
+	"github.com/aws/aws-sdk-go-v2/aws/retry"
 	"github.com/aws/aws-sdk-go-v2/config"
 	"github.com/aws/aws-sdk-go-v2/service/s3"
 	"github.com/aws/aws-sdk-go-v2/service/s3/types"
@@ -52,7 +53,12 @@ func WithProfile(profile string) ProviderOption {
 
 // loadAWSConfig loads AWS configuration with optional profile
 func loadAWSConfig(ctx context.Context, profile string) (aws.Config, error) {
-	optFns := []func(*config.LoadOptions) error{}
+	optFns := []func(*config.LoadOptions) error{
+		// Adaptive retries add client-side rate limiting with jittered backoff
+		// on top of the standard retrier, so bursts of S3 calls (bundle
+		// uploads, versioned prefix deletes) degrade gracefully when throttled.
+		config.WithRetryer(func() aws.Retryer { return retry.NewAdaptiveMode() }),
+	}
 	if profile != "" {
 		optFns = append(optFns, config.WithSharedConfigProfile(profile))
 	}
@@ -297,26 +297,30 @@ func (p *Provider) ListVersions(ctx context.Context, projectID string) ([]models
 	cleanProjectID := p.naming.ExtractProjectID(projectID)
 	prefix := fmt.Sprintf("configs/%s/versions/", cleanProjectID)
 
-	result, err := p.S3Client.ListObjectsV2(ctx, &s3.ListObjectsV2Input{
+	// Paginate so projects with >1000 versions aren't silently truncated
+	pager := s3.NewListObjectsV2Paginator(p.S3Client, &s3.ListObjectsV2Input{
 		Bucket: aws.String(p.BucketName),
 		Prefix: aws.String(prefix),
 	})
-	if err != nil {
-		return nil, fmt.Errorf("failed to list versions: %w", err)
-	}
 
 	var versions []models.VersionInfo
-	for _, obj := range result.Contents {
-		key := aws.ToString(obj.Key)
-		parts := strings.Split(key, "/")
-		if len(parts) >= 4 {
-			versionName := strings.TrimSuffix(parts[3], ".json")
-			version := models.VersionInfo{
-				Version:   versionName,
-				CreatedAt: aws.ToTime(obj.LastModified),
-				Size:      aws.ToInt64(obj.Size),
+	for pager.HasMorePages() {
+		page, err := pager.NextPage(ctx)
+		if err != nil {
+			return nil, fmt.Errorf("failed to list versions: %w", err)
+		}
+		for _, obj := range page.Contents {
+			key := aws.ToString(obj.Key)
+			parts := strings.Split(key, "/")
+			if len(parts) >= 4 {
+				versionName := strings.TrimSuffix(parts[3], ".json")
+				version := models.VersionInfo{
+					Version:   versionName,
+					CreatedAt: aws.ToTime(obj.LastModified),
+					Size:      aws.ToInt64(obj.Size),
+				}
+				versions = append(versions, version)
 			}
-			versions = append(versions, version)
 		}
 	}
 